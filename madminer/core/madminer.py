@@ -1,8 +1,9 @@
+import itertools
 import os
 import logging
 import tempfile
 
-from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict
 from typing import List
@@ -17,12 +18,16 @@ from madminer.utils.morphing import PhysicsMorpher
 from madminer.utils.interfaces.hdf5 import load_madminer_settings
 from madminer.utils.interfaces.hdf5 import save_madminer_settings
 from madminer.utils.interfaces.mg_cards import export_param_card, export_reweight_card, export_run_card
-from madminer.utils.interfaces.mg import generate_mg_process, setup_mg_with_scripts, run_mg, create_master_script
+from madminer.utils.interfaces.mg import copy_ufo_model, generate_mg_process, setup_mg_with_scripts
+from madminer.utils.interfaces.mg import run_mg, open_master_script
 from madminer.utils.interfaces.mg import setup_mg_reweighting_with_scripts, run_mg_reweighting
-from madminer.utils.various import copy_file
+from madminer.utils.various import create_missing_folders, link_or_copy, make_file_executable
 
 logger = logging.getLogger(__name__)
 
+# Translation table used to sanitize parameter, benchmark, and systematics names
+_NAME_TRANS = str.maketrans({" ": "_", "-": "_"})
+
 
 class MadMiner:
     """
@@ -43,20 +48,20 @@ class MadMiner:
     """
 
     def __init__(self):
-        self.parameters = OrderedDict()
-        self.benchmarks = OrderedDict()
+        self.parameters = {}
+        self.benchmarks = {}
         self.default_benchmark = None
         self.morpher = None
         self.export_morphing = False
-        self.systematics = OrderedDict()
-        self.finite_difference_benchmarks = OrderedDict()
+        self.systematics = {}
+        self.finite_difference_benchmarks = {}
         self.finite_difference_epsilon = 0.0
 
     def _reset_systematics(self):
-        self.systematics = OrderedDict()
+        self.systematics = {}
 
     def _reset_benchmarks(self):
-        self.benchmarks = OrderedDict()
+        self.benchmarks = {}
         self.default_benchmark = None
 
     def _reset_morpher(self):
@@ -120,8 +125,7 @@ class MadMiner:
         assert isinstance(parameter_name, str), f"Parameter name is not a string: {parameter_name}"
         assert isinstance(morphing_max_power, int), f"Morphing max power is not an integer: {morphing_max_power}"
 
-        parameter_name = parameter_name.replace(" ", "_")
-        parameter_name = parameter_name.replace("-", "_")
+        parameter_name = parameter_name.translate(_NAME_TRANS)
 
         assert parameter_name not in self.parameters, f"Parameter already exists: {parameter_name}"
 
@@ -139,9 +143,10 @@ class MadMiner:
         self.parameters[parameter_name] = parameter
 
         # The morphing information is not accurate anymore
-        logger.warning("Resetting benchmarks and morphing")
-        self._reset_benchmarks()
-        self._reset_morpher()
+        if self.benchmarks or self.morpher is not None:
+            logger.warning("Resetting benchmarks and morphing")
+            self._reset_benchmarks()
+            self._reset_morpher()
 
     def set_parameters(self, parameters: Union[Dict[str, AnalysisParameter], List[tuple]]):
         """
@@ -159,11 +164,12 @@ class MadMiner:
             None
         """
 
-        self.parameters = OrderedDict()
+        self.parameters = {}
+        add_parameter = self.add_parameter
 
         if isinstance(parameters, dict):
             for param in parameters.values():
-                self.add_parameter(
+                add_parameter(
                     lha_block=param.lha_block,
                     lha_id=param.lha_id,
                     parameter_name=param.name,
@@ -172,14 +178,15 @@ class MadMiner:
                 )
         elif isinstance(parameters, list):
             for values in parameters:
-                self.add_parameter(values[0], values[1])
+                add_parameter(values[0], values[1])
         else:
             raise RuntimeError(f"Invalid set of parameters: {parameters}")
 
         # The morphing information is not accurate anymore
-        logger.warning("Resetting benchmarks and morphing")
-        self._reset_benchmarks()
-        self._reset_morpher()
+        if self.benchmarks or self.morpher is not None:
+            logger.warning("Resetting benchmarks and morphing")
+            self._reset_benchmarks()
+            self._reset_morpher()
 
     def add_benchmark(
         self, parameter_values: Dict[str, float], benchmark_name: str = None, verbose: float = True
@@ -207,35 +214,38 @@ class MadMiner:
             parameter_values does not correspond to a defined parameter.
         """
 
+        parameters = self.parameters
+        benchmarks = self.benchmarks
+
         # Default names
         if benchmark_name is None:
-            benchmark_name = f"benchmark_{len(self.benchmarks)}"
+            benchmark_name = f"benchmark_{len(benchmarks)}"
 
         # Check input
         if not isinstance(parameter_values, dict):
             raise RuntimeError(f"Parameter values are not a dict: {parameter_values}")
 
         for p_name in parameter_values.keys():
-            if p_name not in self.parameters.keys():
+            if p_name not in parameters:
                 raise RuntimeError(f"Unknown parameter: {p_name}")
 
-        if benchmark_name in self.benchmarks.keys():
+        if benchmark_name in benchmarks:
             raise RuntimeError(f"Benchmark {benchmark_name} exists already")
 
         # Add benchmark
-        self.benchmarks[benchmark_name] = Benchmark(
+        benchmarks[benchmark_name] = Benchmark(
             name=benchmark_name,
             values=parameter_values,
         )
 
         # If first benchmark, this will be the default for sampling
-        if len(self.benchmarks) == 1:
+        if len(benchmarks) == 1:
             self.default_benchmark = benchmark_name
 
         if verbose:
-            logger.info("Added benchmark %s", self.benchmarks[benchmark_name])
+            logger.info("Added benchmark %s", benchmarks[benchmark_name])
         else:
-            logger.debug("Added benchmark %s", self.benchmarks[benchmark_name])
+            logger.debug("Added benchmark %s", benchmarks[benchmark_name])
 
     def set_benchmarks(self, benchmarks: Union[Dict[str, dict], List[dict]], verbose: bool = True):
         """
@@ -257,15 +267,16 @@ class MadMiner:
             None
         """
 
-        self.benchmarks = OrderedDict()
+        self.benchmarks = {}
         self.default_benchmark = None
+        add_benchmark = self.add_benchmark
 
         if isinstance(benchmarks, dict):
             for name, values in benchmarks.items():
-                self.add_benchmark(values, name, verbose=verbose)
+                add_benchmark(values, name, verbose=verbose)
         elif isinstance(benchmarks, list):
             for values in benchmarks:
-                self.add_benchmark(values)
+                add_benchmark(values)
         else:
             raise RuntimeError(f"Invalid set of benchmarks: {benchmarks}")
 
@@ -446,8 +457,7 @@ class MadMiner:
                 i += 1
             systematic_name = f"{type}_{i}"
 
-        systematic_name = systematic_name.replace(" ", "_")
-        systematic_name = systematic_name.replace("-", "_")
+        systematic_name = systematic_name.translate(_NAME_TRANS)
 
         scale = SystematicScale.from_str(scale)
         effect = SystematicType.from_str(effect)
@@ -509,16 +519,19 @@ class MadMiner:
             self.finite_difference_epsilon,
         ) = load_madminer_settings(filename, include_nuisance_benchmarks=False)
 
+        if self.default_benchmark is None and len(self.benchmarks) > 0:
+            self.default_benchmark = next(iter(self.benchmarks))
+
+        # The per-entry formatting is only worth doing when INFO records are actually emitted
         logger.info("Found %s parameters:", len(self.parameters))
-        for param in self.parameters.values():
-            logger.info("   %s", param)
+        if logger.isEnabledFor(logging.INFO):
+            for param in self.parameters.values():
+                logger.info("   %s", param)
 
         logger.info("Found %s benchmarks:", len(self.benchmarks))
-        for benchmark in self.benchmarks.values():
-            logger.info("   %s", benchmark)
-
-            if self.default_benchmark is None:
-                self.default_benchmark = benchmark.name
+        if logger.isEnabledFor(logging.INFO):
+            for benchmark in self.benchmarks.values():
+                logger.info("   %s", benchmark)
 
         # Morphing
         self.morpher = None
@@ -539,8 +552,9 @@ class MadMiner:
             logger.info("Did not find systematics setup.")
         else:
             logger.info("Found systematics setup with %s groups", len(self.systematics))
-            for name, systematic in self.systematics.items():
-                logger.debug("  %s: %s", name, systematic)
+            if logger.isEnabledFor(logging.DEBUG):
+                for name, systematic in self.systematics.items():
+                    logger.debug("  %s: %s", name, systematic)
 
     def save(self, filename):
         """
@@ -638,7 +652,7 @@ class MadMiner:
         include_param_card : bool, optional
             If False, no param card is exported, only a reweight card
 
-        benchmarks : None or OrderedDict, optional
+        benchmarks : None or dict, optional
             If None, uses all benchmarks. Otherwise uses these benchmarks.
 
         Returns
@@ -832,6 +846,7 @@ class MadMiner:
         systematics=None,
         order="LO",
         python_executable=None,
+        n_jobs=1,
     ):
 
         """
@@ -908,6 +923,13 @@ class MadMiner:
         python_executable : None or str, optional
             Provides a path to the Python executable that should be used to call MadMiner. Default: None.
 
+        n_jobs : int, optional
+            Number of MadGraph runs that are executed in parallel. The different runs are independent MadGraph
+            processes, so each parallel run uses its own copy of the MG process directory (with suffixes `_0`, `_1`,
+            ...). If 1, all runs share a single process directory and are executed sequentially, as before. If -1,
+            as many runs as there are CPU cores are started in parallel. Has no effect if `only_prepare_script=True`.
+            Default value: 1.
+
         Returns
         -------
             None
@@ -925,7 +947,7 @@ class MadMiner:
             log_directory = "./logs"
 
         if sample_benchmarks is None:
-            sample_benchmarks = [benchmark for benchmark in self.benchmarks.keys()]
+            sample_benchmarks = tuple(self.benchmarks)
 
         # This snippet is useful when using virtual envs.
         # (Derives from a Python2 - Python3 issue).
@@ -938,72 +960,122 @@ class MadMiner:
             initial_command = f"export PATH={binary_folder}:$PATH"
             logger.info(f"Using Python executable {binary_path}")
 
-        # Generate process folder
-        log_file_generate = f"{log_directory}/generate.log"
+        # Parallel runs are independent MadGraph processes, but they cannot share Cards/ and Events/ folders, so
+        # each of them works in its own copy of the process directory
+        n_runs_total = len(run_card_files) * len(sample_benchmarks)
+        parallelize = not only_prepare_script and n_jobs != 1 and n_runs_total > 1
 
-        generate_mg_process(
-            mg_directory,
-            temp_directory,
-            proc_card_file,
-            mg_process_directory,
-            ufo_model_directory=ufo_model_directory,
-            initial_command=initial_command,
-            log_file=log_file_generate,
-            python_executable=python_executable,
-        )
+        if parallelize:
+            process_directories = [f"{mg_process_directory}_{i}" for i in range(n_runs_total)]
+            n_workers = (os.cpu_count() or 1) if n_jobs < 0 else n_jobs
+        else:
+            process_directories = [mg_process_directory] * n_runs_total
+            n_workers = 1
+
+        def _setup_process_directory(process_directory):
+            log_file_generate = (
+                f"{log_directory}/generate.log"
+                if not parallelize
+                else f"{log_directory}/generate{process_directory[len(mg_process_directory):]}.log"
+            )
+
+            generate_mg_process(
+                mg_directory,
+                temp_directory,
+                proc_card_file,
+                process_directory,
+                ufo_model_directory=ufo_model_directory,
+                initial_command=initial_command,
+                log_file=log_file_generate,
+                python_executable=python_executable,
+            )
 
-        # Make MadMiner folders
-        Path(mg_process_directory, "madminer", "cards").mkdir(parents=True, exist_ok=True)
-        Path(mg_process_directory, "madminer", "scripts").mkdir(parents=True, exist_ok=True)
+            # Make MadMiner folders (the intermediate madminer/ folder is implied)
+            create_missing_folders(
+                [
+                    Path(process_directory, "madminer", "cards"),
+                    Path(process_directory, "madminer", "scripts"),
+                ]
+            )
+
+        # Generate process folder(s)
+        unique_process_directories = list(dict.fromkeys(process_directories))
+
+        if parallelize and len(unique_process_directories) > 1:
+            # The UFO model goes into the shared MG directory; copy it once up front so the
+            # setup threads do not race through copy_ufo_model's check-then-copy
+            if ufo_model_directory is not None:
+                copy_ufo_model(ufo_model_directory, mg_directory)
+
+            with ThreadPoolExecutor(max_workers=min(n_workers, len(unique_process_directories))) as executor:
+                for _ in executor.map(_setup_process_directory, unique_process_directories):
+                    pass
+        else:
+            for process_directory in unique_process_directories:
+                _setup_process_directory(process_directory)
 
         # Systematics
         if systematics is None:
             systematics_used = self.systematics
         else:
-            systematics_used = OrderedDict()
+            systematics_used = {}
             for key in systematics:
                 systematics_used[key] = self.systematics[key]
 
+        # Whether PDF or scale variations require settings in the run card (invariant across runs)
+        systematics_need_run_card = any(
+            syst.type in {SystematicType.PDF, SystematicType.SCALE} for syst in systematics_used.values()
+        )
+
         # Loop over settings
-        i = 0
-        mg_scripts = []
+        run_args = []
+
+        # In script mode, stream each run's commands to the master script as they are prepared
+        master_script_file = None
+        master_script_filename = f"{mg_process_directory}/madminer/run.sh"
+        if only_prepare_script:
+            master_script_file = open_master_script(
+                log_directory, master_script_filename, mg_directory, mg_process_directory
+            )
+
+        # Name prefixes of the per-run files, relative to the process directory
+        cards_prefix = "madminer/cards/"
+        scripts_prefix = "madminer/scripts/"
 
-        for run_card_file in run_card_files:
-            for sample_benchmark in sample_benchmarks:
+        run_settings = itertools.product(run_card_files, sample_benchmarks)
+        try:
+            for i, (run_card_file, sample_benchmark) in enumerate(run_settings):
+                process_directory = process_directories[i]
 
                 # Files
-                script_file = f"madminer/scripts/run_{i}.sh"
+                script_file = f"{scripts_prefix}run_{i}.sh"
                 log_file_run = f"run_{i}.log"
-                mg_commands_filename = f"madminer/cards/mg_commands_{i}.dat"
-                param_card_file = f"madminer/cards/param_card_{i}.dat"
-                reweight_card_file = f"madminer/cards/reweight_card_{i}.dat"
+                mg_commands_filename = f"{cards_prefix}mg_commands_{i}.dat"
+                param_card_file = f"{cards_prefix}param_card_{i}.dat"
+                reweight_card_file = f"{cards_prefix}reweight_card_{i}.dat"
                 new_pythia8_card_file = None
                 if pythia8_card_file is not None:
-                    new_pythia8_card_file = f"madminer/cards/pythia8_card_{i}.dat"
+                    new_pythia8_card_file = f"{cards_prefix}pythia8_card_{i}.dat"
                 new_run_card_file = None
                 if run_card_file is not None:
-                    new_run_card_file = f"madminer/cards/run_card_{i}.dat"
+                    new_run_card_file = f"{cards_prefix}run_card_{i}.dat"
                 new_configuration_file = None
                 if configuration_file is not None:
-                    new_configuration_file = f"madminer/cards/me5_configuration_{i}.txt"
-
-                logger.info("Run %s", i)
-                logger.info("  Sampling from benchmark: %s", sample_benchmark)
-                logger.info("  Original run card:       %s", run_card_file)
-                logger.info("  Original Pythia8 card:   %s", pythia8_card_file)
-                logger.info("  Original config card:    %s", configuration_file)
-                logger.info("  Copied run card:         %s", new_run_card_file)
-                logger.info("  Copied Pythia8 card:     %s", new_pythia8_card_file)
-                logger.info("  Copied config card:      %s", new_configuration_file)
-                logger.info("  Param card:              %s", param_card_file)
-                logger.info("  Reweight card:           %s", reweight_card_file)
-                logger.info("  Log file:                %s", log_file_run)
+                    new_configuration_file = f"{cards_prefix}me5_configuration_{i}.txt"
+
+                logger.info("Run %s: sampling from benchmark %s, run card %s", i, sample_benchmark, run_card_file)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("  Original Pythia8 card:   %s", pythia8_card_file)
+                    logger.debug("  Original config card:    %s", configuration_file)
+                    logger.debug("  Copied run card:         %s", new_run_card_file)
+                    logger.debug("  Copied Pythia8 card:     %s", new_pythia8_card_file)
+                    logger.debug("  Copied config card:      %s", new_configuration_file)
+                    logger.debug("  Param card:              %s", param_card_file)
+                    logger.debug("  Reweight card:           %s", reweight_card_file)
+                    logger.debug("  Log file:                %s", log_file_run)
 
                 # Check input
-                if run_card_file is None and any(
-                    syst.type in {SystematicType.PDF, SystematicType.SCALE}
-                    for syst in systematics_used.values()
-                ):
+                if run_card_file is None and systematics_need_run_card:
                     logger.warning(
                         "Warning: No run card given, but PDF or scale variation set up. The correct systematics"
                         " settings are not set automatically. Make sure to set them correctly!"
@@ -1012,33 +1084,33 @@ class MadMiner:
                 # Create param and reweight cards
                 self._export_cards(
                     param_card_template_file,
-                    mg_process_directory,
+                    process_directory,
                     sample_benchmark=sample_benchmark,
-                    param_card_filename=f"{mg_process_directory}/{param_card_file}",
-                    reweight_card_filename=f"{mg_process_directory}/{reweight_card_file}",
+                    param_card_filename=f"{process_directory}/{param_card_file}",
+                    reweight_card_filename=f"{process_directory}/{reweight_card_file}",
                 )
 
                 # Create run card
                 if run_card_file is not None:
                     export_run_card(
                         template_filename=run_card_file,
-                        run_card_filename=f"{mg_process_directory}/{new_run_card_file}",
+                        run_card_filename=f"{process_directory}/{new_run_card_file}",
                         systematics=systematics_used,
                         order=order,
                     )
 
-                # Copy Pythia card
+                # Copy Pythia card (downstream code only reads it, so a hard link suffices)
                 if pythia8_card_file is not None:
-                    copy_file(pythia8_card_file, f"{mg_process_directory}/{new_pythia8_card_file}")
+                    link_or_copy(pythia8_card_file, f"{process_directory}/{new_pythia8_card_file}")
 
                 # Copy Configuration card
                 if configuration_file is not None:
-                    copy_file(configuration_file, f"{mg_process_directory}/{new_configuration_file}")
+                    link_or_copy(configuration_file, f"{process_directory}/{new_configuration_file}")
 
                 # Run MG and Pythia
                 if only_prepare_script:
                     mg_script = setup_mg_with_scripts(
-                        mg_process_directory,
+                        process_directory,
                         proc_card_filename_from_mgprocdir=mg_commands_filename,
                         run_card_file_from_mgprocdir=new_run_card_file,
                         param_card_file_from_mgprocdir=param_card_file,
@@ -1053,45 +1125,61 @@ class MadMiner:
                         python_executable=python_executable,
                         order=order,
                     )
-                    mg_scripts.append(mg_script)
+                    master_script_file.write(mg_script)
+                    master_script_file.write("\n")
                 else:
-                    run_mg(
-                        mg_directory,
-                        mg_process_directory,
-                        f"{mg_process_directory}/{mg_commands_filename}",
-                        f"{mg_process_directory}/{new_run_card_file}",
-                        f"{mg_process_directory}/{param_card_file}",
-                        f"{mg_process_directory}/{reweight_card_file}",
-                        None if new_pythia8_card_file is None else f"{mg_process_directory}/{new_pythia8_card_file}",
-                        None if new_configuration_file is None else f"{mg_process_directory}/{new_configuration_file}",
-                        is_background=is_background,
-                        initial_command=initial_command,
-                        log_file=f"{log_directory}/{log_file_run}",
-                        python_executable=python_executable,
-                        order=order,
+                    run_args.append(
+                        dict(
+                            mg_directory=mg_directory,
+                            mg_process_directory=process_directory,
+                            proc_card_filename=f"{process_directory}/{mg_commands_filename}",
+                            run_card_file=f"{process_directory}/{new_run_card_file}",
+                            param_card_file=f"{process_directory}/{param_card_file}",
+                            reweight_card_file=f"{process_directory}/{reweight_card_file}",
+                            pythia8_card_file=(
+                                None if new_pythia8_card_file is None else f"{process_directory}/{new_pythia8_card_file}"
+                            ),
+                            configuration_card_file=(
+                                None if new_configuration_file is None else f"{process_directory}/{new_configuration_file}"
+                            ),
+                            is_background=is_background,
+                            initial_command=initial_command,
+                            log_file=f"{log_directory}/{log_file_run}",
+                            python_executable=python_executable,
+                            order=order,
+                        )
                     )
-
-                i += 1
-
-        n_runs_total = i
+        finally:
+            # Do not leak the handle if a card export fails mid-loop
+            if master_script_file is not None:
+                master_script_file.close()
 
         # Master shell script
         if only_prepare_script:
-            master_script_filename = f"{mg_process_directory}/madminer/run.sh"
-            create_master_script(
-                log_directory,
-                master_script_filename,
-                mg_directory,
-                mg_process_directory,
-                mg_scripts,
-            )
+            make_file_executable(master_script_filename)
             logger.info(
                 "To generate events, please run:\n\n %s [MG_directory] [MG_process_directory] [log_dir]\n\n",
                 master_script_filename,
             )
 
         else:
-            expected_event_files = [f"{mg_process_directory}/Events/run_{(i+1):02d}" for i in range(n_runs_total)]
+            if parallelize:
+                n_workers = min(n_workers, len(run_args))
+                logger.info("Starting %s MadGraph runs with %s parallel workers", len(run_args), n_workers)
+
+                # MadGraph runs in external processes, so threads are enough to overlap them
+                with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                    futures = [executor.submit(run_mg, **kwargs) for kwargs in run_args]
+                    for future in futures:
+                        future.result()
+
+                expected_event_files = [f"{directory}/Events/run_01" for directory in process_directories]
+            else:
+                for kwargs in run_args:
+                    run_mg(**kwargs)
+
+                expected_event_files = [f"{mg_process_directory}/Events/run_{(i+1):02d}" for i in range(n_runs_total)]
+
             expected_event_files = "\n".join(expected_event_files)
             logger.info(
                 "Finished running MadGraph! Please check that events were successfully generated in the following "
@@ -1161,9 +1249,13 @@ class MadMiner:
         if log_directory is None:
             log_directory = "./logs"
 
-        # Make MadMiner folders
-        Path(mg_process_directory, "madminer", "cards").mkdir(parents=True, exist_ok=True)
-        Path(mg_process_directory, "madminer", "scripts").mkdir(parents=True, exist_ok=True)
+        # Make MadMiner folders (the intermediate madminer/ folder is implied)
+        create_missing_folders(
+            [
+                Path(mg_process_directory, "madminer", "cards"),
+                Path(mg_process_directory, "madminer", "scripts"),
+            ]
+        )
 
         # Files
         script_file = "madminer/scripts/run_reweight.sh"
@@ -1171,7 +1263,7 @@ class MadMiner:
         reweight_card_file = "/madminer/cards/reweight_card_reweight.dat"
 
         # Missing benchmarks
-        missing_benchmarks = OrderedDict()
+        missing_benchmarks = {}
         for benchmark_name in reweight_benchmarks:
             missing_benchmarks[benchmark_name] = self.benchmarks[benchmark_name]
 
@@ -332,59 +332,63 @@ def load_events(
     elif include_nuisance_params is False and benchmark_nuisance_flags is not None:
         benchmark_filter = np.logical_not(np.array(benchmark_nuisance_flags, dtype=bool))
 
-    (
-        observations,
-        weights,
-        sampling_ids,
-    ) = _load_samples(file_name)
+    # Stream the batches directly from the HDF5 datasets, so that only one batch at a time is read into RAM
+    with h5py.File(file_name, "r") as file:
+        try:
+            observations = file["samples/observations"]
+            weights = file["samples/weights"]
+            sampling_ids = file["samples/sampling_benchmarks"]
+        except KeyError:
+            logger.error("HDF5 file does not contain sample information")
+            return
 
-    num_samples = len(observations)
+        num_samples = len(observations)
 
-    if start_index is None:
-        start_index = 0
-    if final_index is None:
-        final_index = num_samples
-    if batch_size is None:
-        batch_size = num_samples
+        if start_index is None:
+            start_index = 0
+        if final_index is None:
+            final_index = num_samples
+        if batch_size is None:
+            batch_size = num_samples
 
-    final_index = min(num_samples, final_index)
-    actual_index = start_index
+        final_index = min(num_samples, final_index)
+        actual_index = start_index
 
-    while actual_index < final_index:
-        batch_final_index = min(actual_index + batch_size, final_index)
+        while actual_index < final_index:
+            batch_final_index = min(actual_index + batch_size, final_index)
 
-        batch_observations = observations[actual_index : batch_final_index]
-        batch_weights = weights[actual_index : batch_final_index]
-        batch_sampling_ids = None
+            batch_observations = observations[actual_index : batch_final_index]
+            batch_weights = weights[actual_index : batch_final_index]
+            batch_sampling_ids = None
 
-        if include_nuisance_params is False:
-            batch_weights = batch_weights[:, benchmark_filter]
+            if include_nuisance_params is False:
+                batch_weights = batch_weights[:, benchmark_filter]
 
-        if sampling_ids.size > 0:
-            batch_sampling_ids = sampling_ids[actual_index : batch_final_index]
+            if sampling_ids.size > 0:
+                batch_sampling_ids = sampling_ids[actual_index : batch_final_index]
 
-            # Only return data matching sampling_benchmark
-            if sampling_benchmark is not None:
-                cut = np.logical_or(
-                    batch_sampling_ids == sampling_benchmark,
-                    batch_sampling_ids < 0,
-                )
+                # Only return data matching sampling_benchmark
+                if sampling_benchmark is not None:
+                    cut = np.logical_or(
+                        batch_sampling_ids == sampling_benchmark,
+                        batch_sampling_ids < 0,
+                    )
 
-                batch_observations = batch_observations[cut]
-                batch_weights = batch_weights[cut]
-                batch_sampling_ids = batch_sampling_ids[cut]
+                    batch_observations = batch_observations[cut]
+                    batch_weights = batch_weights[cut]
+                    batch_sampling_ids = batch_sampling_ids[cut]
 
-            # Rescale weights based on sampling
-            elif sampling_factors is not None:
-                k_factors = sampling_factors[batch_sampling_ids]
-                batch_weights = batch_weights * k_factors[:, np.newaxis]
+                # Rescale weights based on sampling
+                elif sampling_factors is not None:
+                    k_factors = sampling_factors[batch_sampling_ids]
+                    batch_weights = batch_weights * k_factors[:, np.newaxis]
 
-        if include_sampling_ids:
-            yield batch_observations, batch_weights, batch_sampling_ids
-        else:
-            yield batch_observations, batch_weights
+            if include_sampling_ids:
+                yield batch_observations, batch_weights, batch_sampling_ids
+            else:
+                yield batch_observations, batch_weights
 
-        actual_index += batch_size
+            actual_index += batch_size
 
 
 def save_events(
@@ -1112,9 +1116,11 @@ def _save_samples(
             with suppress(KeyError):
                 del file["samples"]
 
-        file.create_dataset("samples/observations", data=sample_observations)
-        file.create_dataset("samples/weights", data=sample_weights)
-        file.create_dataset("samples/sampling_benchmarks", data=sampling_ids)
+        # Chunking and compression keep the (potentially large) event datasets small on disk
+        # and allow `load_events` to stream them batch by batch
+        file.create_dataset("samples/observations", data=sample_observations, chunks=True, compression="gzip")
+        file.create_dataset("samples/weights", data=sample_weights, chunks=True, compression="gzip")
+        file.create_dataset("samples/sampling_benchmarks", data=sampling_ids, chunks=True, compression="gzip")
 
 
 def _load_samples_summary(file_name: str) -> Tuple[np.ndarray, int]:
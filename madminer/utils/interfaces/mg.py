@@ -3,7 +3,7 @@ import shutil
 
 from pathlib import Path
 
-from madminer.utils.various import call_command, make_file_executable
+from madminer.utils.various import call_command, create_missing_folders, make_file_executable
 
 logger = logging.getLogger(__name__)
 
@@ -59,17 +59,20 @@ def generate_mg_process(
     # Preparations
     logger.info("Generating MadGraph process folder from %s at %s", proc_card_file, mg_process_directory)
 
-    Path(temp_directory).mkdir(parents=True, exist_ok=True)
-    Path(mg_process_directory).mkdir(parents=True, exist_ok=True)
-
-    if log_file is not None:
-        Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+    create_missing_folders(
+        [
+            temp_directory,
+            mg_process_directory,
+            None if log_file is None else Path(log_file).parent,
+        ]
+    )
 
     if ufo_model_directory is not None:
         copy_ufo_model(ufo_model_directory, mg_directory)
 
-    # MG commands
-    temp_proc_card_file = Path(temp_directory, "generate.mg5")
+    # MG commands. The temp card is named after the process directory so that
+    # several process folders can be generated in parallel.
+    temp_proc_card_file = Path(temp_directory, f"generate_{Path(mg_process_directory).name}.mg5")
     shutil.copyfile(proc_card_file, temp_proc_card_file)
 
     with open(temp_proc_card_file, "a") as myfile:
@@ -166,14 +169,11 @@ def setup_mg_with_scripts(
     """
 
     # Preparations
-    Path(mg_process_directory).mkdir(parents=True, exist_ok=True)
-
-    if log_dir is not None:
-        Path(log_dir).mkdir(parents=True, exist_ok=True)
+    create_missing_folders([mg_process_directory, log_dir])
 
     if proc_card_filename_from_mgprocdir is not None:
         proc_path = Path(mg_process_directory, proc_card_filename_from_mgprocdir)
-        proc_path.parent.mkdir(parents=True, exist_ok=True)
+        create_missing_folders([proc_path.parent])
 
     # Prepare run...
     logger.info("Preparing script to run MadGraph and Pythia in %s", mg_process_directory)
@@ -380,12 +380,13 @@ def run_mg(
     """
 
     # Preparations
-    Path(mg_process_directory).mkdir(parents=True, exist_ok=True)
-
-    if log_file is not None:
-        Path(log_file).parent.mkdir(parents=True, exist_ok=True)
-    if proc_card_filename is not None:
-        Path(proc_card_filename).parent.mkdir(parents=True, exist_ok=True)
+    create_missing_folders(
+        [
+            mg_process_directory,
+            None if log_file is None else Path(log_file).parent,
+            None if proc_card_filename is None else Path(proc_card_filename).parent,
+        ]
+    )
 
     # Just run it already
     logger.info("Starting MadGraph and Pythia in %s", mg_process_directory)
@@ -484,8 +485,7 @@ def setup_mg_reweighting_with_scripts(
     """
 
     # Preparations
-    if log_dir is not None:
-        Path(log_dir).mkdir(parents=True, exist_ok=True)
+    create_missing_folders([log_dir])
 
     # Prepare run...
     logger.info("Preparing script to reweight an existing sample in %s", mg_process_directory)
@@ -579,8 +579,7 @@ def run_mg_reweighting(mg_process_directory, run_name, reweight_card_file=None,
     """
 
     # Preparations
-    if log_file is not None:
-        Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+    create_missing_folders([None if log_file is None else Path(log_file).parent])
 
     # Prepare run...
     logger.info("Starting reweighting of an existing sample in %s", mg_process_directory)
@@ -608,17 +607,24 @@ def copy_ufo_model(ufo_directory, mg_directory):
     shutil.copytree(ufo_directory, destination)
 
 
-def create_master_script(log_directory, master_script_filename, mg_directory, mg_process_directory, results):
-    placeholder_definition = r"mgdir=${1:-" + mg_directory + r"}" + "\n"
-    placeholder_definition += r"mgprocdir=${2:-" + mg_process_directory + r"}" + "\n"
-    placeholder_definition += r"mmlogdir=${3:-" + log_directory + r"}"
-    commands = "\n".join(results)
-    script = (
+def open_master_script(log_directory, master_script_filename, mg_directory, mg_process_directory):
+    """ Opens the master script and writes its header. The caller appends the per-run commands """
+
+    header = (
         "#!/bin/bash\n\n# Master script to generate events for MadMiner\n\n"
-        + "# Usage: run.sh [MG_directory] [MG_process_directory] [log_directory]\n\n"
-        + "{}\n\n{}"
-    ).format(placeholder_definition, commands)
+        "# Usage: run.sh [MG_directory] [MG_process_directory] [log_directory]\n\n"
+        f"mgdir=${{1:-{mg_directory}}}\n"
+        f"mgprocdir=${{2:-{mg_process_directory}}}\n"
+        f"mmlogdir=${{3:-{log_directory}}}\n\n"
+    )
 
-    with open(master_script_filename, "w") as file:
-        file.write(script)
+    # A large buffer lets the whole script go out in a single write syscall
+    file = open(master_script_filename, "w", buffering=1 << 20)
+    file.write(header)
+    return file
+
+
+def create_master_script(log_directory, master_script_filename, mg_directory, mg_process_directory, results):
+    with open_master_script(log_directory, master_script_filename, mg_directory, mg_process_directory) as file:
+        file.write("\n".join(results))
     make_file_executable(master_script_filename)
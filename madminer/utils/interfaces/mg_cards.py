@@ -1,4 +1,5 @@
 import logging
+import os
 
 from collections import OrderedDict
 from typing import Dict
@@ -12,6 +13,22 @@ from madminer.models import SystematicType
 
 logger = logging.getLogger(__name__)
 
+# Rendered card contents, keyed by everything that enters them. `run_multiple` exports the
+# same cards once per run card x benchmark combination, so repeat renders become dict lookups.
+_param_card_cache = {}
+_reweight_card_cache = {}
+_run_card_cache = {}
+
+
+def _parameter_cache_key(parameters: Dict[str, AnalysisParameter]):
+    return tuple((p.lha_block, p.lha_id, p.transform) for p in parameters.values())
+
+
+def _template_cache_key(template_filename: str):
+    # Keying on mtime and size invalidates cached renders when the template is edited
+    stats = os.stat(template_filename)
+    return template_filename, stats.st_mtime_ns, stats.st_size
+
 
 def export_param_card(
     benchmark: Benchmark,
@@ -20,12 +37,24 @@ def export_param_card(
     mg_process_directory: str,
     param_card_filename: str = None,
 ):
+    cache_key = (
+        _template_cache_key(param_card_template_file),
+        tuple(benchmark.values.items()),
+        _parameter_cache_key(parameters),
+    )
+
+    param_card = _param_card_cache.get(cache_key)
+    if param_card is not None:
+        _write_param_card(param_card, mg_process_directory, param_card_filename)
+        return
+
     # Open parameter card template
     with open(param_card_template_file) as file:
         param_card = file.read()
     lines = param_card.splitlines()
 
-    # Replace parameter values
+    # Values to substitute, keyed by lower-case LHA block and LHA ID
+    replacements = {}
     for param_name, param_value in benchmark.values.items():
         param_lha_block = parameters[param_name].lha_block
         param_lha_id = parameters[param_name].lha_id
@@ -36,53 +65,58 @@ def export_param_card(
             variables = {"theta": param_value}
             param_value = eval(param_transform, variables)
 
-        param_value = float(param_value)
+        replacements[(param_lha_block.lower(), param_lha_id)] = (param_lha_block, float(param_value))
 
-        # Find entry
-        current_block = None
-        changed_line = False
-        for i, line in enumerate(lines):
+    param_blocks = {block for block, _ in replacements}
 
-            # Remove comment
-            try:
-                line = line.split("#")[0]
-            except:
-                pass
+    # Replace parameter values in a single pass over the template
+    missing = set(replacements)
+    current_block = None
+    for i, line in enumerate(lines):
+
+        # Remove comment
+        elements = line.split("#")[0].split()
 
-            elements = line.split()
+        # See if block begin
+        if len(elements) == 2 and elements[0].lower() == "block":
+            current_block = elements[1].lower()
+
+        elif len(elements) == 2 and current_block in param_blocks:
+            try:
+                lha_id = int(elements[0])
+            except ValueError:
+                continue
 
-            # See if block begin
-            if len(elements) == 2 and elements[0].lower() == "block":
-                current_block = elements[1].lower()
+            key = (current_block, lha_id)
+            if key in missing:
+                _, param_value = replacements[key]
+                lines[i] = f"    {lha_id}    {param_value}    # MadMiner"
+                missing.discard(key)
 
-            elif len(elements) == 2 and param_lha_block.lower() == current_block:
-                try:
-                    lha_id = int(elements[0])
-                except ValueError:
-                    continue
+        elif len(elements) == 3 and elements[0].lower() in param_blocks:
+            try:
+                lha_id = int(elements[1])
+            except ValueError:
+                continue
 
-                if lha_id == param_lha_id:
-                    lines[i] = f"    {param_lha_id}    {param_value}    # MadMiner"
-                    changed_line = True
-                    break
+            current_block = None
+            key = (elements[0].lower(), lha_id)
+            if key in missing:
+                param_lha_block, param_value = replacements[key]
+                lines[i] = f"{param_lha_block}    {lha_id}    {param_value}    # MadMiner"
+                missing.discard(key)
 
-            elif len(elements) == 3 and elements[0].lower() == param_lha_block.lower():
-                try:
-                    lha_id = int(elements[1])
-                except ValueError:
-                    continue
+    if missing:
+        missing_ids = ", ".join(str(lha_id) for _, lha_id in sorted(missing))
+        raise ValueError(f"Could not find LHA ID {missing_ids} in param_card template!")
 
-                current_block = None
-                if lha_id == param_lha_id:
-                    lines[i] = f"{param_lha_block}    {param_lha_id}    {param_value}    # MadMiner"
-                    changed_line = True
-                    break
+    param_card = "\n".join(lines)
 
-        if not changed_line:
-            raise ValueError(f"Could not find LHA ID {param_lha_id} in param_card template!")
+    _param_card_cache[cache_key] = param_card
+    _write_param_card(param_card, mg_process_directory, param_card_filename)
 
-        param_card = "\n".join(lines)
 
+def _write_param_card(param_card: str, mg_process_directory: str, param_card_filename: str = None):
     # Output filename
     if param_card_filename is None:
         param_card_filename = f"{mg_process_directory}/Cards/param_card.dat"
@@ -99,6 +133,17 @@ def export_reweight_card(
     mg_process_directory: str,
     reweight_card_filename: str = None,
 ):
+    cache_key = (
+        sample_benchmark,
+        tuple((name, tuple(b.values.items())) for name, b in benchmarks.items()),
+        _parameter_cache_key(parameters),
+    )
+
+    reweight_card = _reweight_card_cache.get(cache_key)
+    if reweight_card is not None:
+        _write_reweight_card(reweight_card, mg_process_directory, reweight_card_filename)
+        return
+
     # Global setup
     lines = [
         "# Reweight card generated by MadMiner",
@@ -132,11 +177,16 @@ def export_reweight_card(
 
     reweight_card = "\n".join(lines)
 
+    _reweight_card_cache[cache_key] = reweight_card
+    _write_reweight_card(reweight_card, mg_process_directory, reweight_card_filename)
+
+
+def _write_reweight_card(reweight_card: str, mg_process_directory: str, reweight_card_filename: str = None):
     # Output filename
     if reweight_card_filename is None:
         reweight_card_filename = f"{mg_process_directory}/Cards/reweight_card.dat"
 
-    # Save param_card.dat
+    # Save reweight_card.dat
     with open(reweight_card_filename, "w") as file:
         file.write(reweight_card)
 
@@ -147,6 +197,17 @@ def export_run_card(
     systematics: Dict[str, Systematic] = None,
     order: str = "LO",
 ):
+    cache_key = (
+        _template_cache_key(template_filename),
+        order,
+        tuple((s.name, s.type, s.value, s.scale) for s in systematics.values()),
+    )
+
+    new_run_card = _run_card_cache.get(cache_key)
+    if new_run_card is not None:
+        _write_run_card(new_run_card, run_card_filename)
+        return
+
     # Open parameter card template
     with open(template_filename) as file:
         run_card_template = file.read()
@@ -215,8 +276,15 @@ def export_run_card(
 
     # Write new run card
     new_run_card = "\n".join(run_card_lines)
+
+    _run_card_cache[cache_key] = new_run_card
+    _write_run_card(new_run_card, run_card_filename)
+
+
+def _write_run_card(run_card: str, run_card_filename: str):
+    # Save run_card.dat
     with open(run_card_filename, "w") as file:
-        file.write(new_run_card)
+        file.write(run_card)
 
 
 def create_systematics_arguments(systematics: Dict[str, Systematic]):
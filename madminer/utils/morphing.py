@@ -341,18 +341,17 @@ class PhysicsMorpher:
         morphing_matrix = np.zeros((n_benchmarks, self.n_components))
 
         # Morphing submatrix for each basis
+        components = np.asarray(self.components)
+
         for i in range(n_bases):
             n_benchmarks_this_basis = self.n_components
             this_basis = basis[i * n_benchmarks_this_basis : (i + 1) * n_benchmarks_this_basis]
+            this_basis = np.asarray(this_basis, dtype=float)
 
-            inv_morphing_submatrix = np.zeros((n_benchmarks_this_basis, self.n_components))
-
-            for b in range(n_benchmarks_this_basis):
-                for c in range(self.n_components):
-                    factor = 1.0
-                    for p in range(self.n_parameters):
-                        factor *= float(this_basis[b, p] ** self.components[c, p])
-                    inv_morphing_submatrix[b, c] = factor
+            # Condition matrix: each entry is the product over parameters of basis point ** component power
+            inv_morphing_submatrix = np.prod(
+                this_basis[:, np.newaxis, :] ** components[np.newaxis, :, :], axis=2
+            )
 
             # Invert -? components expressed in basis points. Shape (n_components, n_benchmarks_this_basis)
             morphing_submatrix = np.linalg.inv(inv_morphing_submatrix)
@@ -411,13 +410,8 @@ class PhysicsMorpher:
             morphing_matrix = self.calculate_morphing_matrix(basis)
 
         # Calculate component weights
-        component_weights = np.zeros(self.n_components)
-        for c in range(self.n_components):
-            factor = 1.0
-            for p in range(self.n_parameters):
-                factor *= float(theta[p] ** self.components[c, p])
-            component_weights[c] = factor
-        component_weights = np.array(component_weights)
+        theta = np.asarray(theta, dtype=float)
+        component_weights = np.prod(theta[np.newaxis, :] ** np.asarray(self.components), axis=1)
 
         # Transform to basis weights
         return morphing_matrix.T.dot(component_weights)
@@ -545,22 +539,19 @@ class PhysicsMorpher:
             morphing_matrix = self.calculate_morphing_matrix(basis)
 
         thetas_test = self._draw_random_thetas(n_thetas=n_test_thetas)
-        squared_weights = 0.0
-        squared_weight_list = []
-
-        for theta in thetas_test:
-            weights = self.calculate_morphing_weights(theta, basis, morphing_matrix)
-            squared_weights += np.sum(weights * weights)
 
-            if return_weights_and_thetas:
-                squared_weight_list.append(np.sum(weights * weights))
+        # Morphing weights for all test thetas in one batch:
+        # component weights with shape (n_test_thetas, n_components), weights with shape (n_test_thetas, n_benchmarks)
+        component_weights = np.prod(
+            thetas_test[:, np.newaxis, :] ** np.asarray(self.components)[np.newaxis, :, :], axis=2
+        )
+        weights = component_weights.dot(morphing_matrix)
+        squared_weights = np.sum(weights * weights, axis=1)
 
         if return_weights_and_thetas:
-            return thetas_test, np.array(squared_weight_list)
-
-        squared_weights /= float(n_test_thetas)
+            return thetas_test, squared_weights
 
-        return -squared_weights
+        return -np.sum(squared_weights) / float(n_test_thetas)
 
     def _propose_basis(self, fixed_benchmarks, n_missing_benchmarks):
         """ Proposes a random basis. """
@@ -13,9 +13,11 @@ logger = logging.getLogger(__name__)
 
 
 def call_command(cmd, log_file=None, return_std=False):
+    # close_fds=False lets the interpreter launch the child via posix_spawn
+    # instead of fork+exec, which avoids copying the parent's page tables
     if log_file is not None:
         with open(log_file, "wb") as log:
-            proc = Popen(cmd, stdout=log, stderr=log, shell=True)
+            proc = Popen(cmd, stdout=log, stderr=log, shell=True, close_fds=False)
             _ = proc.communicate()
             exitcode = proc.returncode
 
@@ -25,7 +27,7 @@ def call_command(cmd, log_file=None, return_std=False):
                 f"Output in file {log_file}."
             )
     else:
-        proc = Popen(cmd, stdout=PIPE, stderr=PIPE, shell=True)
+        proc = Popen(cmd, stdout=PIPE, stderr=PIPE, shell=True, close_fds=False)
         out, err = proc.communicate()
         exitcode = proc.returncode
 
@@ -180,16 +182,82 @@ def math_commands():
     }
 
 
+# Directories that have already been created in this session, so that repeated
+# calls (e.g. once per run in `MadMiner.run_multiple`) skip the mkdir syscalls
+_existing_dirs = set()
+
+
+def create_missing_folders(folders):
+    """ Creates the given directories if needed, skipping those already created in this session """
+
+    for folder in folders:
+        if folder is None:
+            continue
+
+        folder = str(folder)
+        # A memo hit still re-stats the directory: it may have been deleted externally
+        # (e.g. an rm -rf of the process folder) since it was created
+        if folder in _existing_dirs and os.path.isdir(folder):
+            continue
+
+        os.makedirs(folder, exist_ok=True)
+
+        # The parent directories exist now as well, so remember them too
+        while folder and folder not in _existing_dirs:
+            _existing_dirs.add(folder)
+            folder = os.path.dirname(folder)
+
+
 def make_file_executable(filename):
     st = os.stat(filename)
     os.chmod(filename, st.st_mode | stat.S_IEXEC)
 
 
+# Contents of recently copied small files, keyed by (path, mtime, size). `run_multiple`
+# copies the same card files once per run, so repeat copies become a single write
+_copy_cache = {}
+_COPY_CACHE_MAX_BYTES = 4 * 1024 ** 2
+
+
 def copy_file(source, destination):
     if source is None:
         return
 
-    shutil.copyfile(source, destination)
+    # shutil.copyfile already uses zero-copy os.sendfile on Linux, so only the small
+    # files that tend to be copied repeatedly are worth buffering in memory
+    stats = os.stat(source)
+    if stats.st_size > _COPY_CACHE_MAX_BYTES:
+        shutil.copyfile(source, destination)
+        return
+
+    key = (str(source), stats.st_mtime_ns, stats.st_size)
+    contents = _copy_cache.get(key)
+    if contents is None:
+        with open(source, "rb") as file:
+            contents = file.read()
+        _copy_cache[key] = contents
+
+    with open(destination, "wb") as file:
+        file.write(contents)
+
+
+def link_or_copy(source, destination):
+    if source is None:
+        return
+
+    # Remove any leftover destination first: writing through a pre-existing hard
+    # link would silently modify every file sharing its inode
+    try:
+        os.unlink(destination)
+    except FileNotFoundError:
+        pass
+
+    # A hard link turns the clone into a metadata operation. Fall back to a real copy
+    # across devices or on filesystems without link support
+    try:
+        os.link(source, destination)
+    except OSError:
+        copy_file(source, destination)
 
 
 def weighted_quantile(values, quantiles, sample_weight=None, values_sorted=False, old_style=False):